@@ -0,0 +1,443 @@
+"""
+스크래퍼 공통 모듈
+에펨코리아/루리웹 스크래퍼가 함께 쓰는 브라우저 관리, 요청 간격/백오프, 여러 게시글 동시 스크래핑
+"""
+
+import asyncio
+import os
+import random
+import re
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Set
+from urllib.parse import urlparse
+from zoneinfo import ZoneInfo
+import orjson
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright, Response, Route
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+
+# SCRAPER_HEADFUL=1 이면 디버깅용으로 브라우저 창을 띄운다 (기본은 headless)
+HEADLESS = os.environ.get("SCRAPER_HEADFUL", "").lower() not in ("1", "true", "yes")
+BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-accelerated-2d-canvas',
+    '--no-first-run',
+    '--no-zygote',
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+    '--disable-extensions',
+    # 창이 보이지 않아도 타이머/렌더러가 느려지지 않도록
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--disable-features=TranslateUI,site-per-process',
+    # navigator.webdriver 노출을 막아 headless에서도 봇 차단을 덜 받도록
+    '--disable-blink-features=AutomationControlled'
+]
+
+# 브라우저 컨텍스트마다 하나를 골라 고정 (요청마다 바꾸지 않음)
+USER_AGENTS = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# 여러 게시글을 스크래핑할 때 공유하는 Playwright 드라이버 / 브라우저 (사용 중인 호출 수만큼 참조)
+_playwright: Optional[Playwright] = None
+_shared_browser: Optional[Browser] = None
+_shared_browser_users = 0
+# 브라우저 실행/종료와 사용자 수 변경을 한 번에 하나씩 처리 (락은 만든 이벤트 루프에서만 쓸 수 있으므로 루프별로 생성)
+_shared_browser_lock: Optional[asyncio.Lock] = None
+_shared_browser_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# 페이지 이동 / 요소 대기 시간 (ms)
+NAVIGATION_TIMEOUT = 60000
+WAIT_TIMEOUT = 10000
+
+# 작업자 페이지를 이 횟수만큼 쓰면 컨텍스트를 새로 만든다 (장시간 실행 시 메모리 증가 방지)
+PAGE_RECYCLE_AFTER = 50
+
+# 추출에는 src 속성만 필요하므로 실제 바이트는 받지 않는 리소스 타입
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+# 광고/분석 요청 - 추출과 무관하고 로딩만 늦추므로 include_media와 상관없이 항상 차단
+BLOCKED_URL_KEYWORDS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "adservice.google"
+)
+_BLOCKED_URL_RE = re.compile("|".join(re.escape(keyword) for keyword in BLOCKED_URL_KEYWORDS))
+
+# 재시도 설정 (429/5xx 응답에만 지수 백오프 적용)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+
+# 도메인별 연속 실패 횟수 / 쿨다운 종료 시각 (동시에 실행되는 모든 스크래핑이 공유)
+_domain_failures: Dict[str, int] = {}
+_domain_cooldown_until: Dict[str, float] = {}
+
+# 도메인별 초당 최대 요청 수 / 다음 요청 가능 시각 (동시 작업자가 같은 호스트에 몰리지 않도록)
+REQUESTS_PER_SECOND = 4.0
+_domain_next_slot: Dict[str, float] = {}
+
+# 이미 스크래핑한 URL 기록 파일 (중단 후 재실행 시 같은 게시글을 다시 받지 않도록)
+SEEN_URLS_PATH = Path(__file__).parent.parent / "data" / "scraped_urls.jsonl"
+
+_DIGITS_RE = re.compile(r'\d+')
+
+# 수집 시각 기준 시간대
+KST = ZoneInfo('Asia/Seoul')
+
+
+def extract_number(text: str) -> int:
+    """텍스트에서 숫자 추출"""
+    if not text:
+        return 0
+    # 순수 숫자 문자열("12", " 3 ")은 정규식 없이 바로 변환
+    try:
+        number = int(text)
+        if number >= 0:
+            return number
+    except ValueError:
+        pass
+    match = _DIGITS_RE.search(text.replace(',', ''))
+    return int(match.group()) if match else 0
+
+
+async def launch_browser() -> tuple[Playwright, Browser]:
+    """Playwright 드라이버와 브라우저 실행"""
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(
+            headless=HEADLESS,
+            args=BROWSER_ARGS
+        )
+    except Exception:
+        await playwright.stop()
+        raise
+    return playwright, browser
+
+
+def get_shared_browser_lock() -> asyncio.Lock:
+    """현재 이벤트 루프용 공유 브라우저 락 반환
+
+    asyncio.run을 다시 호출해 루프가 바뀌면 락을 새로 만든다. 이전 루프에서 실행한 브라우저는
+    그 루프와 함께 쓸 수 없으므로 참조를 버리고 다음 acquire_shared_browser가 새로 실행하게 한다.
+    """
+    global _playwright, _shared_browser, _shared_browser_users, _shared_browser_lock, _shared_browser_loop
+    loop = asyncio.get_running_loop()
+    if _shared_browser_lock is None or _shared_browser_loop is not loop:
+        _playwright, _shared_browser, _shared_browser_users = None, None, 0
+        _shared_browser_lock = asyncio.Lock()
+        _shared_browser_loop = loop
+    return _shared_browser_lock
+
+
+async def _stop_shared_browser() -> None:
+    """공유 브라우저와 Playwright 드라이버 종료 (get_shared_browser_lock()을 잡은 상태에서 호출)"""
+    global _playwright, _shared_browser
+    browser, playwright = _shared_browser, _playwright
+    _playwright, _shared_browser = None, None
+    if browser is not None:
+        await browser.close()
+    if playwright is not None:
+        await playwright.stop()
+
+
+async def acquire_shared_browser() -> Browser:
+    """공유 브라우저 사용 시작 - 반드시 release_shared_browser와 짝을 맞춘다
+
+    첫 사용자만 브라우저를 실행하고 (동시 호출도 한 번만 실행), 연결이 끊겼으면 새로 실행한다.
+    실행에 실패하면 사용자 수를 늘리지 않으므로 release_shared_browser를 부르지 않는다.
+    """
+    global _playwright, _shared_browser, _shared_browser_users
+    async with get_shared_browser_lock():
+        if _shared_browser is None or not _shared_browser.is_connected():
+            # 끊긴 브라우저가 남아 있으면 드라이버까지 정리하고 다시 실행
+            await _stop_shared_browser()
+            _playwright, _shared_browser = await launch_browser()
+        _shared_browser_users += 1
+        return _shared_browser
+
+
+async def release_shared_browser() -> None:
+    """공유 브라우저 사용 종료 - 마지막 사용자가 반납하면 브라우저 종료"""
+    global _shared_browser_users
+    async with get_shared_browser_lock():
+        _shared_browser_users -= 1
+        if _shared_browser_users == 0:
+            await _stop_shared_browser()
+
+
+@asynccontextmanager
+async def shared_browser() -> AsyncIterator[Browser]:
+    """공유 브라우저를 빌려 쓰는 컨텍스트 매니저
+
+    여러 scrape_*_post / scrape_*_posts 호출을 `async with shared_browser():`로 감싸면
+    그 안의 호출들은 (커뮤니티가 달라도) Chromium을 한 번만 실행해 함께 쓴다.
+    """
+    browser = await acquire_shared_browser()
+    try:
+        yield browser
+    finally:
+        await release_shared_browser()
+
+
+async def block_heavy_resources(route: Route) -> None:
+    """이미지/미디어/폰트와 광고/분석 요청은 중단하고 나머지는 그대로 통과"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or _BLOCKED_URL_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def block_trackers(route: Route) -> None:
+    """광고/분석 요청만 중단 (include_media=True일 때 사용)"""
+    if _BLOCKED_URL_RE.search(route.request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def new_page(
+    browser: Browser,
+    include_media: bool = False,
+    init_script: Optional[str] = None
+) -> tuple[BrowserContext, Page]:
+    """새 컨텍스트(쿠키 격리)와 페이지 생성 - 브라우저 프로세스는 재사용
+
+    include_media가 False이면 이미지/미디어/폰트 다운로드를 차단한다 (광고/분석 요청은 항상 차단).
+    init_script를 넘기면 컨텍스트의 모든 문서에 한 번씩 등록한다 (추출 스크립트 등록용).
+    """
+    context = await browser.new_context(
+        user_agent=random.choice(USER_AGENTS),
+        viewport={'width': 1920, 'height': 1080}
+    )
+    await context.route("**/*", block_trackers if include_media else block_heavy_resources)
+    if init_script:
+        await context.add_init_script(init_script)
+
+    page = await context.new_page()
+    page.set_default_timeout(NAVIGATION_TIMEOUT)
+
+    return context, page
+
+
+@lru_cache(maxsize=1024)
+def url_domain(url: str) -> str:
+    """URL의 도메인(netloc) 반환 (같은 URL은 한 번만 파싱)"""
+    return urlparse(url).netloc
+
+
+def backoff_delay(failures: int) -> float:
+    """연속 실패 횟수에 따른 대기 시간 계산 (지수 백오프 + 지터)"""
+    return min(BACKOFF_CAP, BACKOFF_BASE * 2 ** failures) + random.uniform(0, 0.3)
+
+
+async def wait_for_request_slot(url: str) -> None:
+    """도메인별 요청 간격(1 / REQUESTS_PER_SECOND)과 쿨다운을 지키도록 대기"""
+    domain = url_domain(url)
+    now = asyncio.get_running_loop().time()
+    slot = max(now, _domain_next_slot.get(domain, 0.0), _domain_cooldown_until.get(domain, 0.0))
+    _domain_next_slot[domain] = slot + 1.0 / REQUESTS_PER_SECOND
+    if slot > now:
+        await asyncio.sleep(slot - now)
+
+
+def record_response_status(url: str, status: int) -> Optional[float]:
+    """응답 상태를 도메인 백오프 상태에 반영
+
+    429/5xx이면 연속 실패 횟수를 늘리고 도메인 쿨다운을 건 뒤 대기 시간을 반환하고,
+    그 밖의 상태면 연속 실패 횟수를 초기화하고 None 반환
+    """
+    domain = url_domain(url)
+    if status not in RETRY_STATUS_CODES:
+        _domain_failures[domain] = 0
+        return None
+
+    failures = _domain_failures.get(domain, 0) + 1
+    _domain_failures[domain] = failures
+    delay = backoff_delay(failures)
+    _domain_cooldown_until[domain] = asyncio.get_running_loop().time() + delay
+    return delay
+
+
+async def goto_with_backoff(page: Page, url: str) -> Optional[Response]:
+    """페이지 이동 - 서버가 429/5xx를 반환할 때만 백오프 후 재시도
+
+    재시도를 다 써도 429/5xx이면 오류 페이지를 넘기지 않도록 None 반환
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        # 요청 간격 + 다른 작업이 걸어둔 쿨다운 존중
+        await wait_for_request_slot(url)
+
+        # 추출할 데이터는 DOMContentLoaded 시점에 이미 있으므로 networkidle까지 기다리지 않음
+        response = await page.goto(url, wait_until='domcontentloaded', timeout=NAVIGATION_TIMEOUT)
+        if response is None:
+            return None
+        delay = record_response_status(url, response.status)
+        if delay is None:
+            return response
+        if attempt < MAX_RETRIES:
+            print(f"HTTP {response.status} 응답 - {delay:.1f}초 후 재시도: {url}")
+
+    print(f"HTTP {response.status} 응답 - 재시도 횟수 초과: {url}")
+    return None
+
+
+async def wait_for_post(page: Page, ready_selector: str) -> None:
+    """본문/댓글 영역이 렌더링될 때까지 대기 (없으면 있는 그대로 추출 진행)"""
+    try:
+        await page.wait_for_selector(ready_selector, timeout=WAIT_TIMEOUT)
+    except PlaywrightTimeoutError:
+        print(f"게시글 영역 대기 시간 초과: {page.url}")
+
+
+def save_to_json(data: Dict[str, Any], filename: str) -> bool:
+    """JSON 파일로 저장 (frontend/public 폴더에 저장)"""
+    try:
+        # frontend/public 폴더에 저장
+        public_dir = Path(__file__).parent.parent.parent / "frontend" / "public"
+        public_dir.mkdir(parents=True, exist_ok=True)
+
+        filepath = public_dir / filename
+        filepath.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+        print(f"Data saved to: {filepath}")
+        return True
+    except Exception as e:
+        print(f"Error saving to JSON: {e}")
+        return False
+
+
+def load_seen_urls(path: Path = SEEN_URLS_PATH) -> Set[str]:
+    """이전 실행에서 스크래핑한 URL 집합 로드 (한 줄에 URL 하나, 파일이 없으면 빈 집합)"""
+    seen: Set[str] = set()
+    try:
+        with path.open("rb") as f:
+            for line in f:
+                try:
+                    seen.add(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # 기록 중에 중단돼 잘린 줄은 건너뜀 (다시 스크래핑됨)
+                    continue
+    except OSError:
+        pass
+    return seen
+
+
+def open_seen_urls_log(path: Path = SEEN_URLS_PATH) -> BinaryIO:
+    """스크래핑한 URL을 한 줄씩 덧붙여 기록할 파일 열기"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open("ab")
+
+
+def append_seen_url(log: BinaryIO, url: str) -> None:
+    """스크래핑한 URL 한 줄 기록 (바로 flush해 중단돼도 그때까지의 기록은 남음)"""
+    log.write(orjson.dumps(url) + b"\n")
+    log.flush()
+
+
+async def stream_posts(
+    urls: List[str],
+    scrape_post: Callable[..., Awaitable[Optional[Dict[str, Any]]]],
+    concurrency: int = 4,
+    include_media: bool = False,
+    init_script: Optional[str] = None,
+    seen_path: Optional[Path] = None
+) -> AsyncIterator[tuple[int, Optional[Dict[str, Any]]]]:
+    """여러 게시글을 동시에 스크래핑하면서 끝나는 순서대로 (urls 인덱스, 결과)를 내보냄
+
+    scrape_post(url, get_page=get_page)로 게시글 하나를 스크래핑한다 (커뮤니티별 scrape_*_post).
+    get_page는 브라우저가 필요할 때만 부르는 함수로, 작업자가 처음 부를 때 공유 브라우저를 빌려
+    컨텍스트/페이지 하나를 만들고 이후에는 재사용한다 (게시글마다 쿠키를 비우고,
+    PAGE_RECYCLE_AFTER건마다 컨텍스트를 새로 만든다). 브라우저가 필요 없는 게시글만 있으면
+    Chromium을 실행하지 않는다.
+    seen_path를 넘기면 그 파일에 기록된 URL은 건너뛰고(내보내지 않음), 성공한 URL은 바로 기록한다.
+    중간에 그만 받으려면 contextlib.aclosing으로 감싸 작업자와 브라우저를 바로 정리한다.
+    """
+    seen = load_seen_urls(seen_path) if seen_path else set()
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, url in enumerate(urls):
+        if url not in seen:
+            queue.put_nowait((index, url))
+    if queue.empty():
+        return
+    # 작업자가 끝낸 결과 - 작업자 하나가 끝날 때마다 그 작업자의 Task가 들어온다
+    finished: asyncio.Queue = asyncio.Queue()
+
+    async def worker() -> None:
+        browser: Optional[Browser] = None
+        context: Optional[BrowserContext] = None
+        page: Optional[Page] = None
+        uses = 0
+        # 지금 게시글이 브라우저를 썼는지 (정적 HTML로 끝난 게시글은 쿠키 정리/사용 횟수에서 제외)
+        page_used = False
+
+        async def get_page() -> Page:
+            """작업자 페이지 반환 - 처음 부를 때만 공유 브라우저를 빌려 페이지를 만든다"""
+            nonlocal browser, context, page, uses, page_used
+            if browser is None:
+                browser = await acquire_shared_browser()
+            if context is not None and uses >= PAGE_RECYCLE_AFTER:
+                await context.close()
+                context = None
+            if context is None:
+                context, page = await new_page(browser, include_media, init_script)
+                uses = 0
+            page_used = True
+            return page
+
+        try:
+            while not queue.empty():
+                index, url = queue.get_nowait()
+                page_used = False
+                result = await scrape_post(url, get_page=get_page)
+                if page_used:
+                    uses += 1
+                    # 컨텍스트를 재사용하므로 게시글 사이에 쿠키만 비운다
+                    await context.clear_cookies()
+                if seen_log and result is not None:
+                    append_seen_url(seen_log, url)
+                finished.put_nowait((index, result))
+        finally:
+            if context is not None:
+                await context.close()
+            # 빌려 쓴 공유 브라우저 반납 (마지막 작업자가 반납하면 종료)
+            if browser is not None:
+                await release_shared_browser()
+
+    seen_log = open_seen_urls_log(seen_path) if seen_path else None
+    tasks = [asyncio.create_task(worker()) for _ in range(min(concurrency, queue.qsize()))]
+    for task in tasks:
+        task.add_done_callback(finished.put_nowait)
+    running = len(tasks)
+    try:
+        while running:
+            item = await finished.get()
+            if isinstance(item, asyncio.Task):
+                running -= 1
+                # 작업자가 실패하면 남은 작업자를 기다리지 않고 바로 전파 (아래 finally에서 취소)
+                if not item.cancelled() and item.exception() is not None:
+                    raise item.exception()
+            else:
+                yield item
+    finally:
+        # 중간에 그만 받거나 작업자가 실패하면 남은 작업자를 취소하고 컨텍스트/브라우저 정리를 기다림
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if seen_log:
+            seen_log.close()
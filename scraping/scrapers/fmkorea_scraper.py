@@ -4,14 +4,38 @@
 """
 
 import asyncio
-import json
 import re
+import sys
 from datetime import datetime
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-import pytz
-from playwright.async_api import async_playwright, Browser, Page, ElementHandle
-from jsonschema import validate, ValidationError
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+import httpx
+from playwright.async_api import Browser, Page
+import fastjsonschema
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+# 스크립트로 직접 실행해도(python fmkorea_scraper.py) scrapers 패키지를 찾도록 scraping/ 경로 추가
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scrapers.common import (
+    KST,
+    MAX_RETRIES,
+    RETRY_STATUS_CODES,
+    USER_AGENTS,
+    acquire_shared_browser,
+    extract_number,
+    goto_with_backoff,
+    new_page,
+    record_response_status,
+    release_shared_browser,
+    save_to_json,
+    stream_posts,
+    wait_for_post,
+    wait_for_request_slot
+)
 
 
 # 에펨코리아 셀렉터 정의 (실제 HTML 구조에 맞게 수정)
@@ -45,6 +69,66 @@ FMKOREA_SELECTORS = {
     }
 }
 
+# 정적 요청은 공유 HTTP 클라이언트 하나로 보내므로 USER_AGENTS의 첫 번째 값으로 고정
+# (브라우저 컨텍스트는 new_page에서 USER_AGENTS 중 하나를 무작위로 고름)
+USER_AGENT = USER_AGENTS[0]
+
+# 정적 HTML 요청 설정 (브라우저 없이 가져올 때 사용)
+HTTP_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8"
+}
+HTTP_TIMEOUT = 10.0
+# h2 패키지(httpx[http2])가 설치되어 있으면 한 연결로 요청을 다중화하는 HTTP/2 사용
+HTTP2_ENABLED = find_spec("h2") is not None
+# 모든 정적 요청이 같은 연결 풀을 공유 (keep-alive 유지, 연결 수 상한)
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=50)
+# 연결 실패(연결/TLS 단계)만 재시도 - HTTP 상태 코드 재시도는 하지 않음
+HTTP_CONNECT_RETRIES = 2
+
+# 게시글 본문/댓글은 서버에서 렌더링되므로 본문 영역 마커가 없으면 봇 차단(챌린지) 페이지로 판단
+STATIC_POST_MARKER = "rd_body"
+
+# 브라우저로 다시 시도해도 소용없는 정적 응답 (삭제/없는 게시글) - 그 밖의 오류 응답(403/430 등)은 브라우저로 대체
+STATIC_GIVE_UP_STATUS_CODES = {404, 410}
+
+# 이벤트 루프별로 하나만 유지하는 keep-alive HTTP 클라이언트
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# 본문 또는 댓글 영역이 나타나면 추출을 시작해도 되는 것으로 판단
+POST_READY_SELECTOR = ".xe_content, .rd_body, .fdb_lst_ul"
+
+# 자주 쓰는 정규식 (모듈 로드 시 한 번만 컴파일)
+# https://www.fmkorea.com/<숫자> 와 index.php?...&document_srl=<숫자> 형태를 모두 처리
+_POST_ID_RE = re.compile(r'(?:document_srl=|/)(\d+)(?=/?$|[&#])')
+_MARGIN_RE = re.compile(r'margin-left:(\d+)%')
+_FIND_COMMENT_RE = re.compile(r'findComment\((\d+)\)')
+# '비추천 수'는 '추천 수'를 포함하므로 먼저 검사
+_STAT_LABEL_RE = re.compile(r'비추천 수|조회 수|추천 수|댓글')
+_SPACE_RE = re.compile(r'\s+')
+# 블록 경계 표시 - 연달아 나오면 줄바꿈 하나로 합침
+_BLOCK_BREAK = "\x00"
+_BLOCK_BREAK_RE = re.compile(r'[ \x00]*\x00[ \x00]*')
+
+# innerText 규칙: 렌더링되지 않는 태그는 제외하고, 블록 요소 경계에서는 줄을 바꿈
+HIDDEN_TEXT_TAGS = frozenset({"script", "style", "noscript", "template"})
+BLOCK_TEXT_TAGS = frozenset({
+    "p", "div", "li", "ul", "ol", "dl", "dt", "dd", "table", "tr", "blockquote", "pre",
+    "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "header", "footer", "form",
+})
+
+# 조회/추천/비추천/댓글 수가 들어있는 span (없는 레이아웃이면 문서 전체 span에서 찾음)
+STAT_SPAN_SELECTOR = ".btm_area .side.fr span"
+
+# 통계 span 라벨 → 메타데이터 키
+STAT_LABEL_KEYS = {
+    "조회 수": "view_count",
+    "추천 수": "up_count",
+    "비추천 수": "down_count",
+    "댓글": "comment_count"
+}
+
 # JSON 스키마 정의 (새 스키마 적용)
 POST_SCHEMA = {
     "type": "object",
@@ -133,169 +217,423 @@ POST_SCHEMA = {
     "required": ["post_id", "community", "metadata", "content", "comments"]
 }
 
+# 스키마를 검증 코드로 한 번만 컴파일해 두고 게시글마다 재사용
+_VALIDATE_POST = fastjsonschema.compile(POST_SCHEMA)
 
+
+# 브라우저 안에서 한 번의 evaluate로 실행하는 추출 스크립트
+# (요소/속성마다 CDP 왕복하지 않도록 DOM 순회를 브라우저에서 처리)
+EXTRACT_METADATA_JS = """
+() => {
+    const text = (sel) => document.querySelector(sel)?.innerText ?? "";
+    const counts = { view: "", up: "", down: "", comment: "" };
+    const labelKeys = { "조회 수": "view", "추천 수": "up", "비추천 수": "down", "댓글": "comment" };
+    const labelRe = /비추천 수|조회 수|추천 수|댓글/;
+    const statSpans = document.querySelectorAll(".btm_area .side.fr span");
+    for (const span of statSpans.length ? statSpans : document.querySelectorAll("span")) {
+        const match = labelRe.exec(span.innerText);
+        const b = match && span.querySelector("b");
+        if (b) counts[labelKeys[match[0]]] = b.textContent;
+    }
+    return {
+        title: text(".np_18px_span"),
+        author: text(".member_plate").trim(),
+        date: (document.querySelector(".date")?.textContent ?? "").trim(),
+        counts
+    };
+}
+"""
+
+EXTRACT_CONTENT_JS = """
+(containerSelector) => {
+    // 안쪽 p/div 하위 트리는 그 요소에서 따로 나오므로 건너뛰고, 나머지 텍스트(인라인 요소 포함)만 순서대로 모음
+    const ownText = (el) => Array.from(el.childNodes, (n) =>
+        n.nodeType === Node.TEXT_NODE ? n.textContent.replace(/\\s+/g, " ")
+        : n.nodeType !== Node.ELEMENT_NODE || n.matches("p, div") ? ""
+        : n.querySelector("p, div") ? ownText(n) : n.innerText
+    ).join("");
+    const container = document.querySelector(containerSelector);
+    if (!container) return [];
+    const content = [];
+    let order = 0;
+    for (const el of container.querySelectorAll("*")) {
+        const tag = el.tagName.toLowerCase();
+        if (tag === "img") {
+            // 지연 로딩 이미지는 data-original에 원본 주소가 있다
+            const src = el.getAttribute("data-original") || el.getAttribute("src") || "";
+            if (src) content.push({ type: "image", order: order++, data: {
+                src,
+                alt: el.getAttribute("alt") || "",
+                width: el.getAttribute("width") || "",
+                height: el.getAttribute("height") || ""
+            }});
+        } else if (tag === "video") {
+            const src = el.getAttribute("src") || "";
+            if (src) content.push({ type: "video", order: order++, data: {
+                src,
+                autoplay: el.hasAttribute("autoplay"),
+                muted: el.hasAttribute("muted")
+            }});
+        } else if (tag === "p" || tag === "div") {
+            // 안쪽에 p/div가 있으면 그 텍스트는 안쪽 요소에서 나오므로 중복되지 않게 제외
+            const text = (el.querySelector("p, div") ? ownText(el) : el.innerText).trim();
+            if (text) content.push({ type: "text", order: order++, data: { text } });
+        }
+    }
+    return content;
+}
+"""
+
+# parse_comments와 같이 첫 번째 댓글 목록(.fdb_lst_ul)의 직계 자식만 사용
+EXTRACT_COMMENTS_JS = """
+() => Array.from(document.querySelector(".fdb_lst_ul")?.children ?? []).filter((item) => item.matches(".fdb_itm")).map((item) => {
+    const body = item.querySelector(".xe_content");
+    return {
+        id: item.id,
+        author: (item.querySelector(".member_plate")?.innerText ?? "").trim(),
+        content: (body?.innerText ?? "").trim(),
+        date: (item.querySelector(".meta .date")?.textContent ?? "").trim(),
+        up: item.querySelector(".voted_count")?.textContent ?? "0",
+        down: item.querySelector(".blamed_count")?.textContent ?? "0",
+        style: item.getAttribute("style") || "",
+        onclick: item.querySelector(".findParent")?.getAttribute("onclick") || "",
+        images: body ? Array.from(body.querySelectorAll("img"), (img) => ({
+            src: img.getAttribute("data-original") || img.getAttribute("src") || "",
+            alt: img.getAttribute("alt") || ""
+        })) : []
+    };
+})
+"""
+
+# 이름 → 추출 스크립트 (new_page에서 window.__fmkoreaExtract로 한 번만 등록)
+EXTRACTOR_SOURCES = {
+    # 메타데이터/본문/댓글을 한 번의 evaluate로 모두 추출
+    "post": """
+(containerSelector) => ({
+    metadata: (%s)(),
+    content: (%s)(containerSelector),
+    comments: (%s)()
+})
+""" % (EXTRACT_METADATA_JS.strip(), EXTRACT_CONTENT_JS.strip(), EXTRACT_COMMENTS_JS.strip()),
+    # 댓글만 추출 (iter_comments용)
+    "comments": EXTRACT_COMMENTS_JS
+}
+EXTRACTORS_INIT_JS = "window.__fmkoreaExtract = {%s};" % ", ".join(
+    f"{name}: {source.strip()}" for name, source in EXTRACTOR_SOURCES.items()
+)
+# 등록된 추출 함수를 이름으로 호출 (등록되지 않은 페이지면 null)
+CALL_EXTRACTOR_JS = """
+([name, arg]) => window.__fmkoreaExtract ? { value: window.__fmkoreaExtract[name](arg) } : null
+"""
+
+
+@lru_cache(maxsize=1024)
 def extract_post_id(url: str) -> str:
-    """URL에서 게시글 ID 추출"""
-    match = re.search(r'/(\d+)/?$', url)
+    """URL에서 게시글 ID 추출 (같은 URL은 한 번만 파싱)"""
+    # 가장 흔한 https://www.fmkorea.com/<숫자> 형태는 정규식 없이 처리
+    tail = (url[:-1] if url.endswith('/') else url).rpartition('/')[2]
+    if tail.isdecimal():
+        return tail
+    match = _POST_ID_RE.search(url)
     return match.group(1) if match else ""
 
 
-def extract_number(text: str) -> int:
-    """텍스트에서 숫자 추출"""
-    if not text:
+async def run_extractor(page: Page, name: str, arg: Any = None) -> Any:
+    """등록된 추출 스크립트를 이름으로 실행 (new_page로 만들지 않은 페이지면 소스를 그대로 evaluate)"""
+    result = await page.evaluate(CALL_EXTRACTOR_JS, [name, arg])
+    if result is None:
+        return await page.evaluate(EXTRACTOR_SOURCES[name], arg)
+    return result["value"]
+
+
+def build_metadata(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """추출 스크립트가 돌려준 원시 메타데이터를 스키마 형태로 변환"""
+    counts = raw["counts"]
+    return {
+        "title": raw["title"],
+        "author": raw["author"],
+        "date": raw["date"],
+        "view_count": extract_number(counts.get("view")),
+        "up_count": extract_number(counts.get("up")),
+        "down_count": extract_number(counts.get("down")),
+        "comment_count": extract_number(counts.get("comment"))
+    }
+
+
+def comment_level(style: str) -> int:
+    """margin-left 스타일 값으로 댓글 레벨 계산 (2%당 1레벨)"""
+    if "margin-left" not in style:
         return 0
-    match = re.search(r'\d+', text.replace(',', ''))
-    return int(match.group()) if match else 0
-
-
-async def setup_browser() -> tuple[Browser, Page]:
-    """브라우저 초기화"""
-    playwright = await async_playwright().start()
-    browser = await playwright.chromium.launch(
-        headless=True,
-        args=[
-            '--no-sandbox',
-            '--disable-setuid-sandbox',
-            '--disable-dev-shm-usage',
-            '--disable-accelerated-2d-canvas',
-            '--no-first-run',
-            '--no-zygote',
-            '--disable-gpu'
-        ]
-    )
-    
-    context = await browser.new_context(
-        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        viewport={'width': 1920, 'height': 1080}
-    )
-    
-    page = await context.new_page()
-    page.set_default_timeout(60000)
+    if "margin-left:10%" in style:
+        return 5
+    elif "margin-left:8%" in style:
+        return 4
+    elif "margin-left:6%" in style:
+        return 3
+    elif "margin-left:4%" in style:
+        return 2
+    elif "margin-left:2%" in style:
+        return 1
+    # 다른 margin-left 값이 있을 수 있으니 정규식으로 추출
+    margin_match = _MARGIN_RE.search(style)
+    if margin_match:
+        return int(margin_match.group(1)) // 2  # 2%씩 증가하므로
+    return 1
+
+
+def find_parent_id(onclick: str) -> str:
+    """findComment(부모 ID) 형태의 onclick 속성에서 부모 댓글 ID 추출"""
+    if not onclick or "findComment(" not in onclick:
+        return ""
+    parent_id_match = _FIND_COMMENT_RE.search(onclick)
+    return parent_id_match.group(1) if parent_id_match else ""
+
+
+def resolve_parent_id(
+    parent_stack: List[tuple[int, str]],
+    comment_id: str,
+    level: int,
+    is_reply: bool,
+    parent_comment_id: str
+) -> str:
+    """부모 댓글 ID 결정 - findComment 참조가 없으면 이전 댓글 중 레벨이 낮은 것을 부모로 사용
     
-    return browser, page
+    parent_stack은 (레벨, 댓글 ID)를 레벨이 단조 증가하도록 유지하며 호출마다 갱신된다.
+    """
+    while parent_stack and parent_stack[-1][0] >= level:
+        parent_stack.pop()
+    if is_reply and not parent_comment_id and parent_stack:
+        parent_comment_id = parent_stack[-1][1]
+    parent_stack.append((level, comment_id))
+    return parent_comment_id
 
 
-async def extract_metadata(page: Page) -> Dict[str, Any]:
-    """메타데이터 추출 (실제 HTML 구조에 맞게 수정)"""
-    metadata = {}
+def build_comments(raw_comments: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """추출 스크립트가 돌려준 원시 댓글 목록을 댓글 데이터로 하나씩 변환"""
+    # 부모 후보 스택: (레벨, 댓글 ID) - 레벨이 단조 증가하도록 유지
+    parent_stack: List[tuple[int, str]] = []
     
-    # 제목
-    title_element = await page.query_selector(".np_18px_span")
-    metadata["title"] = await title_element.inner_text() if title_element else ""
+    for raw in raw_comments:
+        # 댓글 ID (id 속성에서 추출)
+        item_id = raw["id"]
+        comment_id = item_id.replace("comment_", "") if item_id.startswith("comment_") else item_id
+        
+        # 대댓글 여부 및 레벨 (margin-left 스타일로 판단)
+        style = raw["style"]
+        is_reply = "margin-left" in style
+        level = comment_level(style)
+        
+        # 부모 댓글 ID (대댓글인 경우 findComment() 참조 확인)
+        parent_comment_id = find_parent_id(raw["onclick"]) if is_reply else ""
+        
+        # 미디어 (이미지)
+        media = [
+            {"type": "image", "order": idx, "data": {"src": img["src"], "alt": img["alt"]}}
+            for idx, img in enumerate(raw["images"])
+            if img["src"]
+        ]
+        
+        yield {
+            "comment_id": comment_id,
+            "author": raw["author"],
+            "content": raw["content"],
+            "date": raw["date"],
+            "up_count": extract_number(raw["up"]),
+            "down_count": extract_number(raw["down"]),
+            "is_reply": is_reply,
+            "level": level,
+            "parent_comment_id": resolve_parent_id(parent_stack, comment_id, level, is_reply, parent_comment_id),
+            "media": media
+        }
+
+
+async def extract_post(page: Page) -> tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """메타데이터, 본문, 댓글을 한 번의 evaluate로 추출 (CDP 왕복 1회)"""
+    raw = await run_extractor(page, "post", FMKOREA_SELECTORS["content"]["container"])
+    return build_metadata(raw["metadata"]), raw["content"], list(build_comments(raw["comments"]))
+
+
+async def iter_comments(page: Page) -> AsyncIterator[Dict[str, Any]]:
+    """댓글을 하나씩 내보내는 비동기 이터레이터 (소비자가 앞 댓글을 저장하는 동안 다음 댓글 변환)
+
+    async for comment in iter_comments(page): await writer.send(comment)
+    """
+    for comment in build_comments(await run_extractor(page, "comments")):
+        yield comment
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """keep-alive 연결을 재사용하는 공유 HTTP 클라이언트 반환 (이벤트 루프별 1개)"""
+    global _http_client, _http_client_loop
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_ENABLED,
+            limits=HTTP_LIMITS,
+            retries=HTTP_CONNECT_RETRIES
+        )
+        _http_client = httpx.AsyncClient(
+            headers=HTTP_HEADERS,
+            timeout=HTTP_TIMEOUT,
+            follow_redirects=True,
+            transport=transport
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """공유 HTTP 클라이언트 종료"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+async def fetch_static_html(url: str) -> Optional[httpx.Response]:
+    """브라우저 없이 게시글 HTML 요청 - 429/5xx이면 goto_with_backoff와 같은 백오프로 재시도
+
+    요청 자체가 실패하면 None, 재시도를 다 써도 429/5xx이면 마지막 응답을 그대로 반환
+    """
+    client = get_http_client()
+    for attempt in range(MAX_RETRIES + 1):
+        # 브라우저 요청과 같은 도메인 요청 간격/쿨다운을 따름
+        await wait_for_request_slot(url)
+        try:
+            response = await client.get(url)
+        except httpx.HTTPError as e:
+            print(f"정적 HTML 요청 실패: {e}")
+            return None
+        delay = record_response_status(url, response.status_code)
+        if delay is None:
+            return response
+        if attempt < MAX_RETRIES:
+            print(f"HTTP {response.status_code} 응답 - {delay:.1f}초 후 재시도: {url}")
     
-    # 작성자 (member_plate에서 텍스트만 추출)
-    author_element = await page.query_selector(".member_plate")
-    if author_element:
-        author_text = await author_element.inner_text()
-        metadata["author"] = author_text.strip() if author_text else ""
-    else:
-        metadata["author"] = ""
+    print(f"HTTP {response.status_code} 응답 - 재시도 횟수 초과: {url}")
+    return response
+
+
+def parse_metadata(tree: LexborHTMLParser) -> Dict[str, Any]:
+    """정적 HTML에서 메타데이터 추출 (EXTRACT_METADATA_JS와 동일한 규칙)"""
+    title_node = tree.css_first(".np_18px_span")
+    author_node = tree.css_first(".member_plate")
+    date_node = tree.css_first(".date")
     
-    # 날짜
-    date_element = await page.query_selector(".date")
-    metadata["date"] = await date_element.inner_text() if date_element else ""
+    metadata = {
+        "title": inner_text(title_node),
+        "author": inner_text(author_node),
+        "date": inner_text(date_node),
+        "view_count": 0,
+        "up_count": 0,
+        "down_count": 0,
+        "comment_count": 0
+    }
     
-    # 조회수, 추천수, 댓글수 (span 텍스트에서 추출)
-    try:
-        # 모든 span 요소를 가져와서 텍스트 확인
-        span_elements = await page.query_selector_all("span")
-        
-        metadata["view_count"] = 0
-        metadata["up_count"] = 0
-        metadata["down_count"] = 0
-        metadata["comment_count"] = 0
-        
-        for span in span_elements:
-            text = await span.inner_text()
-            if "조회 수" in text:
-                # "조회 수 202" 형태에서 숫자 추출
-                b_element = await span.query_selector("b")
-                if b_element:
-                    view_text = await b_element.inner_text()
-                    metadata["view_count"] = extract_number(view_text)
-            elif "추천 수" in text:
-                b_element = await span.query_selector("b")
-                if b_element:
-                    up_text = await b_element.inner_text()
-                    metadata["up_count"] = extract_number(up_text)
-            elif "댓글" in text:
-                b_element = await span.query_selector("b")
-                if b_element:
-                    comment_text = await b_element.inner_text()
-                    metadata["comment_count"] = extract_number(comment_text)
-                    
-    except Exception as e:
-        print(f"메타데이터 추출 중 오류: {e}")
-        metadata["view_count"] = 0
-        metadata["up_count"] = 0
-        metadata["down_count"] = 0
-        metadata["comment_count"] = 0
+    # 조회수, 추천수, 비추천수, 댓글수 (span 텍스트에서 추출)
+    for span in tree.css(STAT_SPAN_SELECTOR) or tree.css("span"):
+        match = _STAT_LABEL_RE.search(inner_text(span))
+        if not match:
+            continue
+        b_node = span.css_first("b")
+        if b_node:
+            metadata[STAT_LABEL_KEYS[match.group()]] = extract_number(inner_text(b_node))
     
     return metadata
 
 
-async def extract_content(page: Page) -> List[Dict[str, Any]]:
-    """본문 콘텐츠 추출"""
+def collect_text(node: LexborNode, parts: List[str], skip_nested_blocks: bool) -> None:
+    """innerText 순서대로 텍스트 조각을 모음 (<br>과 블록 경계는 줄바꿈)"""
+    for child in node.iter(include_text=True):
+        tag = child.tag
+        if tag == "-text":
+            parts.append(_SPACE_RE.sub(" ", child.text_content or ""))
+        elif tag == "br":
+            parts.append("\n")
+        elif tag in HIDDEN_TEXT_TAGS or (skip_nested_blocks and tag in ("p", "div")):
+            continue
+        elif tag in BLOCK_TEXT_TAGS:
+            parts.append(_BLOCK_BREAK)
+            collect_text(child, parts, skip_nested_blocks)
+            parts.append(_BLOCK_BREAK)
+        else:
+            collect_text(child, parts, skip_nested_blocks)
+
+
+def inner_text(node: Optional[LexborNode], skip_nested_blocks: bool = False) -> str:
+    """브라우저 innerText에 맞춘 텍스트 (script/style 제외, <br>은 줄바꿈, 줄마다 공백 정리)
+
+    skip_nested_blocks이면 안쪽 p/div 하위 트리의 텍스트는 그 요소에서 따로 나오므로 제외
+    """
+    if node is None:
+        return ""
+    parts: List[str] = []
+    collect_text(node, parts, skip_nested_blocks)
+    text = _BLOCK_BREAK_RE.sub("\n", "".join(parts))
+    lines = [line.strip() for line in text.split("\n")]
+    return "\n".join(lines).strip()
+
+
+def block_text(node: LexborNode) -> str:
+    """p/div 텍스트 - 안쪽에 p/div가 있으면 그 블록의 텍스트만 빼서 중복을 피함"""
+    # css()는 노드 자신도 포함하므로 2개 이상이면 안쪽 블록이 있는 것
+    return inner_text(node, skip_nested_blocks=len(node.css("p, div")) > 1)
+
+
+def parse_content(tree: LexborHTMLParser) -> List[Dict[str, Any]]:
+    """정적 HTML에서 본문 콘텐츠 추출 (EXTRACT_CONTENT_JS와 동일한 규칙)"""
     content = []
     order = 0
     
-    container = await page.query_selector(FMKOREA_SELECTORS["content"]["container"])
+    container = tree.css_first(FMKOREA_SELECTORS["content"]["container"])
     if not container:
         return content
     
-    # 모든 자식 요소를 순서대로 처리
-    children = await container.query_selector_all("*")
-    
-    for child in children:
-        tag_name = await child.evaluate("el => el.tagName.toLowerCase()")
+    for child in container.css("*"):
+        # lexbor의 css("*")는 컨테이너 자신도 포함하므로 제외 (query_selector_all과 동일하게)
+        if child == container:
+            continue
+        tag_name = child.tag
+        attrs = child.attributes
         
         if tag_name == "img":
-            # 이미지 처리
-            src = await child.get_attribute("src") or ""
-            alt = await child.get_attribute("alt") or ""
-            width = await child.get_attribute("width") or ""
-            height = await child.get_attribute("height") or ""
-            
+            # 지연 로딩 이미지는 data-original에 원본 주소가 있다
+            src = attrs.get("data-original") or attrs.get("src") or ""
             if src:
                 content.append({
                     "type": "image",
                     "order": order,
                     "data": {
                         "src": src,
-                        "alt": alt,
-                        "width": width,
-                        "height": height
+                        "alt": attrs.get("alt") or "",
+                        "width": attrs.get("width") or "",
+                        "height": attrs.get("height") or ""
                     }
                 })
                 order += 1
                 
         elif tag_name == "video":
-            # 비디오 처리
-            src = await child.get_attribute("src") or ""
-            autoplay = await child.get_attribute("autoplay") is not None
-            muted = await child.get_attribute("muted") is not None
-            
+            src = attrs.get("src") or ""
             if src:
                 content.append({
                     "type": "video",
                     "order": order,
                     "data": {
                         "src": src,
-                        "autoplay": autoplay,
-                        "muted": muted
+                        "autoplay": "autoplay" in attrs,
+                        "muted": "muted" in attrs
                     }
                 })
                 order += 1
                 
         elif tag_name in ["p", "div"]:
-            # 텍스트 처리
-            text = await child.inner_text()
-            if text and text.strip():
+            text = block_text(child)
+            if text:
                 content.append({
                     "type": "text",
                     "order": order,
                     "data": {
-                        "text": text.strip()
+                        "text": text
                     }
                 })
                 order += 1
@@ -303,180 +641,143 @@ async def extract_content(page: Page) -> List[Dict[str, Any]]:
     return content
 
 
-async def extract_comments(page: Page) -> List[Dict[str, Any]]:
-    """댓글 추출 (실제 HTML 구조에 맞게 수정)"""
+def parse_comments(tree: LexborHTMLParser) -> List[Dict[str, Any]]:
+    """정적 HTML에서 댓글 추출 (EXTRACT_COMMENTS_JS와 동일한 규칙)"""
     comments = []
     
-    # 댓글 컨테이너 확인
-    comment_container = await page.query_selector(".fdb_lst_ul")
+    comment_container = tree.css_first(".fdb_lst_ul")
     if not comment_container:
         return comments
     
-    comment_items = await comment_container.query_selector_all(".fdb_itm")
+    parent_stack: List[tuple[int, str]] = []
     
-    for item in comment_items:
-        try:
-            comment_data = {}
-            
-            # 댓글 ID (id 속성에서 추출)
-            item_id = await item.get_attribute("id") or ""
-            if item_id.startswith("comment_"):
-                comment_id = item_id.replace("comment_", "")
-            else:
-                comment_id = item_id
-            comment_data["comment_id"] = comment_id
-            
-            # 작성자 (member_plate에서 텍스트 추출)
-            author_element = await item.query_selector(".member_plate")
-            if author_element:
-                author_text = await author_element.inner_text()
-                comment_data["author"] = author_text.strip() if author_text else ""
-            else:
-                comment_data["author"] = ""
-            
-            # 내용 (.xe_content에서 추출)
-            content_element = await item.query_selector(".xe_content")
-            if content_element:
-                content_text = await content_element.inner_text()
-                comment_data["content"] = content_text.strip() if content_text else ""
-            else:
-                comment_data["content"] = ""
-            
-            # 날짜 (.meta .date에서 추출)
-            date_element = await item.query_selector(".meta .date")
-            comment_data["date"] = await date_element.inner_text() if date_element else ""
-            
-            # 추천수 (.voted_count에서 추출)
-            up_element = await item.query_selector(".voted_count")
-            up_text = await up_element.inner_text() if up_element else "0"
-            comment_data["up_count"] = extract_number(up_text)
-            
-            # 비추천수 (.blamed_count에서 추출)
-            down_element = await item.query_selector(".blamed_count")
-            down_text = await down_element.inner_text() if down_element else "0"
-            comment_data["down_count"] = extract_number(down_text)
-            
-            # 대댓글 여부 및 레벨 (margin-left 스타일로 판단)
-            style = await item.get_attribute("style") or ""
-            is_reply = "margin-left" in style
-            comment_data["is_reply"] = is_reply
-            
-            # 레벨 계산 (margin-left 값으로 - 더 정확한 계산)
-            if is_reply:
-                if "margin-left:10%" in style:
-                    comment_data["level"] = 5
-                elif "margin-left:8%" in style:
-                    comment_data["level"] = 4
-                elif "margin-left:6%" in style:
-                    comment_data["level"] = 3
-                elif "margin-left:4%" in style:
-                    comment_data["level"] = 2
-                elif "margin-left:2%" in style:
-                    comment_data["level"] = 1
-                else:
-                    # 다른 margin-left 값이 있을 수 있으니 정규식으로 추출
-                    import re
-                    margin_match = re.search(r'margin-left:(\d+)%', style)
-                    if margin_match:
-                        margin_percent = int(margin_match.group(1))
-                        comment_data["level"] = margin_percent // 2  # 2%씩 증가하므로
-                    else:
-                        comment_data["level"] = 1
-            else:
-                comment_data["level"] = 0
-            
-            # 부모 댓글 ID (대댓글인 경우)
-            comment_data["parent_comment_id"] = ""
-            if comment_data["is_reply"]:
-                # 1. HTML에서 findComment() 함수로 직접 참조하는 부모 ID 찾기
-                try:
-                    find_parent_element = await item.query_selector(".findParent")
-                    if find_parent_element:
-                        onclick_attr = await find_parent_element.get_attribute("onclick")
-                        if onclick_attr and "findComment(" in onclick_attr:
-                            import re
-                            parent_id_match = re.search(r'findComment\((\d+)\)', onclick_attr)
-                            if parent_id_match:
-                                comment_data["parent_comment_id"] = parent_id_match.group(1)
-                except:
-                    pass
-                
-                # 2. findComment로 찾지 못한 경우, 이전 댓글 중 레벨이 낮은 것을 부모로 설정
-                if not comment_data["parent_comment_id"] and len(comments) > 0:
-                    for prev_comment in reversed(comments):
-                        if prev_comment["level"] < comment_data["level"]:
-                            comment_data["parent_comment_id"] = prev_comment["comment_id"]
-                            break
-            
-            # 미디어 (이미지)
-            media = []
-            image_elements = await item.query_selector_all(".xe_content img")
-            for idx, img in enumerate(image_elements):
-                src = await img.get_attribute("src") or ""
-                alt = await img.get_attribute("alt") or ""
-                if src:
-                    media.append({
-                        "type": "image",
-                        "order": idx,
-                        "data": {
-                            "src": src,
-                            "alt": alt
-                        }
-                    })
-            
-            comment_data["media"] = media
-            comments.append(comment_data)
-            
-        except Exception as e:
-            print(f"댓글 추출 중 오류: {e}")
+    # 댓글 li는 항상 ul의 직계 자식이므로 하위 트리 전체를 검색하지 않고 자식만 순회 (목록도 만들지 않음)
+    for item in comment_container.iter():
+        # selectolax의 attributes는 접근할 때마다 dict를 새로 만드므로 한 번만 읽는다
+        item_attrs = item.attributes
+        if item.tag != "li" or "fdb_itm" not in (item_attrs.get("class") or "").split():
             continue
+        item_id = item_attrs.get("id") or ""
+        comment_id = item_id.replace("comment_", "") if item_id.startswith("comment_") else item_id
+        
+        author_node = item.css_first(".member_plate")
+        content_node = item.css_first(".xe_content")
+        date_node = item.css_first(".meta .date")
+        up_node = item.css_first(".voted_count")
+        down_node = item.css_first(".blamed_count")
+        
+        style = item_attrs.get("style") or ""
+        is_reply = "margin-left" in style
+        level = comment_level(style)
+        
+        parent_comment_id = ""
+        if is_reply:
+            find_parent_node = item.css_first(".findParent")
+            if find_parent_node:
+                parent_comment_id = find_parent_id(find_parent_node.attributes.get("onclick") or "")
+        
+        # 이미지는 댓글 전체가 아니라 이미 찾은 본문 노드 안에서만 검색
+        media = []
+        images = content_node.css("img") if content_node else []
+        for idx, img in enumerate(images):
+            img_attrs = img.attributes
+            src = img_attrs.get("data-original") or img_attrs.get("src") or ""
+            if src:
+                media.append({
+                    "type": "image",
+                    "order": idx,
+                    "data": {
+                        "src": src,
+                        "alt": img_attrs.get("alt") or ""
+                    }
+                })
+        
+        comments.append({
+            "comment_id": comment_id,
+            "author": inner_text(author_node),
+            "content": inner_text(content_node),
+            "date": inner_text(date_node),
+            "up_count": extract_number(inner_text(up_node) or "0"),
+            "down_count": extract_number(inner_text(down_node) or "0"),
+            "is_reply": is_reply,
+            "level": level,
+            "parent_comment_id": resolve_parent_id(parent_stack, comment_id, level, is_reply, parent_comment_id),
+            "media": media
+        })
     
     return comments
 
 
+def parse_post_html(html: str) -> tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """정적 HTML을 한 번 파싱해 메타데이터, 본문, 댓글 추출"""
+    tree = LexborHTMLParser(html)
+    return parse_metadata(tree), parse_content(tree), parse_comments(tree)
+
+
 def validate_data(data: Dict[str, Any]) -> bool:
     """데이터 유효성 검사"""
     try:
-        validate(instance=data, schema=POST_SCHEMA)
+        _VALIDATE_POST(data)
         return True
-    except ValidationError as e:
+    except fastjsonschema.JsonSchemaException as e:
         print(f"Validation error: {e}")
         return False
 
 
-def save_to_json(data: Dict[str, Any], filename: str) -> bool:
-    """JSON 파일로 저장 (frontend/public 폴더에 저장)"""
-    try:
-        # frontend/public 폴더에 저장
-        public_dir = Path(__file__).parent.parent.parent / "frontend" / "public"
-        public_dir.mkdir(parents=True, exist_ok=True)
-        
-        filepath = public_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        print(f"Data saved to: {filepath}")
-        return True
-    except Exception as e:
-        print(f"Error saving to JSON: {e}")
-        return False
-
-
-async def scrape_fmkorea_post(url: str) -> Optional[Dict[str, Any]]:
-    """에펨코리아 게시글 스크래핑 메인 함수"""
-    browser = None
+async def scrape_fmkorea_post(
+    url: str,
+    browser: Optional[Browser] = None,
+    page: Optional[Page] = None,
+    include_media: bool = False,
+    get_page: Optional[Callable[[], Awaitable[Page]]] = None
+) -> Optional[Dict[str, Any]]:
+    """에펨코리아 게시글 스크래핑 메인 함수
+    
+    page를 넘기면 그 페이지를 그대로 쓰고, browser를 넘기면 컨텍스트만 새로 만들어 쓰며,
+    둘 다 없으면 공유 브라우저를 빌려 쓴다 (shared_browser() 밖에서 호출하면 끝날 때 종료).
+    get_page를 넘기면 브라우저가 필요할 때만 불러 그 페이지를 쓴다 (stream_posts 작업자용).
+    include_media가 True이면 이미지/미디어/폰트도 내려받는다 (기본은 차단).
+    """
+    uses_shared_browser = False
+    context = None
     try:
-        # 브라우저 설정
-        browser, page = await setup_browser()
-        
-        # 페이지 이동
-        await page.goto(url, wait_until='networkidle', timeout=60000)
-        
-        # 데이터 추출
         post_id = extract_post_id(url)
-        metadata = await extract_metadata(page)
-        content = await extract_content(page)
-        comments = await extract_comments(page)
+        
+        # 기본은 HTTP 요청 + selectolax 파싱 - 없는 게시글(404/410)이거나 429/5xx 재시도를 다 쓰면 포기하고,
+        # 요청 실패 / 그 밖의 오류 응답(403/430 등) / 본문 없는 200(봇 차단 페이지)이면 브라우저 사용
+        static_response = await fetch_static_html(url)
+        static_status = static_response.status_code if static_response is not None else None
+        if static_status in STATIC_GIVE_UP_STATUS_CODES or static_status in RETRY_STATUS_CODES:
+            print(f"게시글 응답 오류 (HTTP {static_status}): {url}")
+            return None
+        if static_status == 200 and STATIC_POST_MARKER in static_response.text:
+            metadata, content, comments = parse_post_html(static_response.text)
+        else:
+            if static_status is None:
+                print(f"정적 HTML 요청 실패 - 브라우저로 대체: {url}")
+            elif static_status != 200:
+                print(f"정적 HTML 응답 오류 (HTTP {static_status}) - 브라우저로 대체: {url}")
+            else:
+                print(f"정적 HTML에 본문 없음 - 브라우저로 대체: {url}")
+            # 브라우저 설정 (넘겨받은 페이지/브라우저가 없을 때만 새로 생성)
+            if page is None and get_page is not None:
+                page = await get_page()
+            if page is None:
+                if browser is None:
+                    browser = await acquire_shared_browser()
+                    uses_shared_browser = True
+                context, page = await new_page(browser, include_media, EXTRACTORS_INIT_JS)
+            
+            # 페이지 이동 (429/5xx 응답 시 백오프 후 재시도) - 오류 응답이면 추출하지 않음
+            response = await goto_with_backoff(page, url)
+            if response is None or not response.ok:
+                status = response.status if response else "없음"
+                print(f"게시글 응답 오류 (HTTP {status}): {url}")
+                return None
+            await wait_for_post(page, POST_READY_SELECTOR)
+            
+            # 데이터 추출
+            metadata, content, comments = await extract_post(page)
         
         # 결과 구성
         result = {
@@ -485,7 +786,7 @@ async def scrape_fmkorea_post(url: str) -> Optional[Dict[str, Any]]:
             "metadata": metadata,
             "content": content,
             "comments": comments,
-            "scraped_at": datetime.now(pytz.timezone('Asia/Seoul')).isoformat()
+            "scraped_at": datetime.now(KST).isoformat()
         }
         
         # 유효성 검사
@@ -499,8 +800,43 @@ async def scrape_fmkorea_post(url: str) -> Optional[Dict[str, Any]]:
         print(f"Error scraping post: {e}")
         return None
     finally:
-        if browser:
-            await browser.close()
+        if context:
+            await context.close()
+        # 빌려 쓴 공유 브라우저 반납
+        if uses_shared_browser:
+            await release_shared_browser()
+
+
+def stream_fmkorea_posts(
+    urls: List[str],
+    concurrency: int = 4,
+    include_media: bool = False,
+    seen_path: Optional[Path] = None
+) -> AsyncIterator[tuple[int, Optional[Dict[str, Any]]]]:
+    """여러 게시글을 동시에 스크래핑하면서 끝나는 순서대로 (urls 인덱스, 결과)를 내보냄
+    
+    작업자/브라우저 관리는 common.stream_posts가 맡는다 (작업자 페이지마다 추출 스크립트 등록).
+    정적 HTML로 처리되는 게시글만 있으면 브라우저를 실행하지 않는다.
+    seen_path를 넘기면 그 파일에 기록된 URL은 건너뛰고(내보내지 않음), 성공한 URL은 바로 기록한다.
+    중간에 그만 받으려면 contextlib.aclosing으로 감싸 작업자와 브라우저를 바로 정리한다.
+    """
+    return stream_posts(urls, scrape_fmkorea_post, concurrency, include_media, EXTRACTORS_INIT_JS, seen_path)
+
+
+async def scrape_fmkorea_posts(
+    urls: List[str],
+    concurrency: int = 4,
+    include_media: bool = False,
+    seen_path: Optional[Path] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """여러 게시글을 동시에 스크래핑 (결과는 urls 순서 유지, 건너뛴 URL은 None)
+    
+    결과를 차례로 처리하려면 stream_fmkorea_posts를 쓴다.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
+    async for index, result in stream_fmkorea_posts(urls, concurrency, include_media, seen_path):
+        results[index] = result
+    return results
 
 
 async def main():
@@ -516,6 +852,8 @@ async def main():
         print("Scraping completed successfully!")
     else:
         print("Scraping failed!")
+    
+    await close_http_client()
 
 
 if __name__ == "__main__":
@@ -5,14 +5,30 @@
 """
 
 import asyncio
-import json
 import re
+import sys
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-import pytz
-from playwright.async_api import async_playwright, Browser, Page, ElementHandle
-from jsonschema import validate, ValidationError
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any
+from playwright.async_api import Browser, Page
+import fastjsonschema
+
+# 스크립트로 직접 실행해도(python ruliweb_scraper.py) scrapers 패키지를 찾도록 scraping/ 경로 추가
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scrapers.common import (
+    KST,
+    acquire_shared_browser,
+    extract_number,
+    goto_with_backoff,
+    new_page,
+    release_shared_browser,
+    save_to_json,
+    stream_posts,
+    wait_for_post
+)
 
 
 # 루리웹 셀렉터 정의
@@ -51,6 +67,97 @@ RULIWEB_SELECTORS = {
     }
 }
 
+# 본문/댓글 영역 - 하나라도 나타나면 추출 시작
+POST_READY_SELECTOR = ".view_content, .comment_view_wrapper"
+
+# 자주 쓰는 정규식 (모듈 로드 시 한 번만 컴파일)
+_POST_ID_RE = re.compile(r'/read/(\d+)')
+_VIEW_COUNT_RE = re.compile(r'조회\s+(\d+)')
+
+# 메타데이터 필드를 한 번의 evaluate로 원시 텍스트로 직렬화하는 JS
+EXTRACT_METADATA_JS = """
+(sel) => {
+    const find = (s) => document.querySelector(s);
+    return {
+        title: find(sel.title)?.innerText ?? '',
+        category: find(sel.category)?.innerText ?? '',
+        author: find(sel.author)?.innerText ?? '',
+        date: (find(sel.date)?.textContent ?? '').trim(),
+        // "추천 41 | 조회 1506" 형태의 첫 번째 정보 줄 (:contains는 querySelector에서 쓸 수 없음)
+        viewText: find('.user_info p')?.innerText ?? '',
+        up: find(sel.up_count)?.textContent ?? '0',
+        down: find(sel.down_count)?.textContent ?? '0',
+        comments: find(sel.comment_count)?.textContent ?? '0'
+    };
+}
+"""
+
+# 본문 컨테이너의 모든 하위 요소를 태그/속성/텍스트 목록으로 한 번에 직렬화하는 JS
+DESCRIBE_CONTENT_JS = """
+(selector) => {
+    // 안쪽 p/div 하위 트리는 그 요소에서 따로 나오므로 건너뛰고, 나머지 텍스트(인라인 요소 포함)만 순서대로 모음
+    const ownText = (el) => Array.from(el.childNodes, (n) =>
+        n.nodeType === Node.TEXT_NODE ? n.textContent.replace(/\\s+/g, ' ')
+        : n.nodeType !== Node.ELEMENT_NODE || n.matches('p, div') ? ''
+        : n.querySelector('p, div') ? ownText(n) : n.innerText
+    ).join('');
+    const container = document.querySelector(selector);
+    if (!container) return [];
+    return Array.from(container.querySelectorAll('*'), (el) => {
+        const tag = el.tagName.toLowerCase();
+        return {
+            tag,
+            src: el.getAttribute('src') || '',
+            alt: el.getAttribute('alt') || '',
+            width: el.getAttribute('width') || '',
+            height: el.getAttribute('height') || '',
+            autoplay: el.hasAttribute('autoplay'),
+            muted: el.hasAttribute('muted'),
+            // 안쪽에 p/div가 있으면 그 텍스트는 안쪽 요소에서 나오므로 중복되지 않게 제외
+            text: (tag !== 'p' && tag !== 'div') ? ''
+                : el.querySelector('p, div') ? ownText(el) : el.innerText
+        };
+    });
+}
+"""
+
+# BEST/일반 댓글 목록을 한 번의 evaluate로 원시 데이터 목록으로 직렬화하는 JS
+EXTRACT_COMMENTS_JS = """
+(sel) => {
+    const serialize = (item) => {
+        const find = (s) => item.querySelector(s);
+        return {
+            id: item.id,
+            className: item.getAttribute('class') || '',
+            author: find(sel.author)?.innerText ?? '',
+            content: find(sel.content)?.innerText ?? '',
+            date: (find(sel.date)?.textContent ?? '').trim(),
+            up: find(sel.up_count)?.textContent ?? '0',
+            down: find(sel.down_count)?.textContent ?? '0',
+            images: Array.from(item.querySelectorAll(sel.images), (img) => ({
+                src: img.getAttribute('src') || '',
+                alt: img.getAttribute('alt') || '',
+                width: img.getAttribute('width') || '',
+                height: img.getAttribute('height') || ''
+            }))
+        };
+    };
+    return {
+        best: Array.from(document.querySelectorAll(sel.best_items), serialize),
+        normal: Array.from(document.querySelectorAll(sel.normal_items), serialize)
+    };
+}
+"""
+
+# 메타데이터/본문/댓글을 한 번의 evaluate로 함께 직렬화하는 JS
+EXTRACT_POST_JS = """
+(sel) => ({
+    metadata: (%s)(sel.metadata),
+    content: (%s)(sel.content.container),
+    comments: (%s)(sel.comments)
+})
+""" % (EXTRACT_METADATA_JS.strip(), DESCRIBE_CONTENT_JS.strip(), EXTRACT_COMMENTS_JS.strip())
+
 # JSON 스키마 정의 (새 스키마 적용)
 POST_SCHEMA = {
     "type": "object",
@@ -140,152 +247,74 @@ POST_SCHEMA = {
     "required": ["post_id", "community", "metadata", "content", "comments"]
 }
 
+# 스키마를 검증 코드로 한 번만 컴파일해 두고 게시글마다 재사용
+_VALIDATE_POST = fastjsonschema.compile(POST_SCHEMA)
+
 
+@lru_cache(maxsize=1024)
 def extract_post_id(url: str) -> str:
-    """URL에서 게시글 ID 추출"""
-    match = re.search(r'/read/(\d+)', url)
+    """URL에서 게시글 ID 추출 (같은 URL은 한 번만 파싱)"""
+    match = _POST_ID_RE.search(url)
     return match.group(1) if match else ""
 
 
-def extract_number(text: str) -> int:
-    """텍스트에서 숫자 추출"""
-    if not text:
-        return 0
-    match = re.search(r'\d+', text.replace(',', ''))
-    return int(match.group()) if match else 0
-
-
-async def setup_browser() -> tuple[Browser, Page]:
-    """브라우저 초기화"""
-    playwright = await async_playwright().start()
-    browser = await playwright.chromium.launch(
-        headless=True,
-        args=[
-            '--no-sandbox',
-            '--disable-setuid-sandbox',
-            '--disable-dev-shm-usage',
-            '--disable-accelerated-2d-canvas',
-            '--no-first-run',
-            '--no-zygote',
-            '--disable-gpu'
-        ]
-    )
-    
-    context = await browser.new_context(
-        user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        viewport={'width': 1920, 'height': 1080}
-    )
-    
-    page = await context.new_page()
-    page.set_default_timeout(60000)
-    
-    return browser, page
-
-
-async def extract_metadata(page: Page) -> Dict[str, Any]:
-    """메타데이터 추출"""
-    metadata = {}
-    
-    # 제목
-    title_element = await page.query_selector(RULIWEB_SELECTORS["metadata"]["title"])
-    metadata["title"] = await title_element.inner_text() if title_element else ""
-    
-    # 카테고리
-    category_element = await page.query_selector(RULIWEB_SELECTORS["metadata"]["category"])
-    metadata["category"] = await category_element.inner_text() if category_element else ""
-    
-    # 작성자
-    author_element = await page.query_selector(RULIWEB_SELECTORS["metadata"]["author"])
-    metadata["author"] = await author_element.inner_text() if author_element else ""
-    
-    # 날짜
-    date_element = await page.query_selector(RULIWEB_SELECTORS["metadata"]["date"])
-    metadata["date"] = await date_element.inner_text() if date_element else ""
-    
-    # 조회수 (텍스트에서 추출)
-    view_element = await page.query_selector(".user_info p")
-    view_text = ""
-    if view_element:
-        view_text = await view_element.inner_text()
+def build_metadata(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """EXTRACT_METADATA_JS가 돌려준 원시 데이터를 스키마 형태로 변환"""
     # "추천 41 | 조회 1506" 형태에서 조회수 추출
-    view_match = re.search(r'조회\s+(\d+)', view_text)
-    metadata["view_count"] = int(view_match.group(1)) if view_match else 0
-    
-    # 추천수
-    up_element = await page.query_selector(RULIWEB_SELECTORS["metadata"]["up_count"])
-    up_text = await up_element.inner_text() if up_element else "0"
-    metadata["up_count"] = extract_number(up_text)
-    
-    # 비추천수
-    down_element = await page.query_selector(RULIWEB_SELECTORS["metadata"]["down_count"])
-    down_text = await down_element.inner_text() if down_element else "0"
-    metadata["down_count"] = extract_number(down_text)
-    
-    # 댓글수
-    comment_element = await page.query_selector(RULIWEB_SELECTORS["metadata"]["comment_count"])
-    comment_text = await comment_element.inner_text() if comment_element else "0"
-    # [9] 형태에서 숫자 추출
-    metadata["comment_count"] = extract_number(comment_text)
-    
-    return metadata
+    view_match = _VIEW_COUNT_RE.search(raw["viewText"])
+    return {
+        "title": raw["title"],
+        "category": raw["category"],
+        "author": raw["author"],
+        "date": raw["date"],
+        "view_count": int(view_match.group(1)) if view_match else 0,
+        "up_count": extract_number(raw["up"]),
+        "down_count": extract_number(raw["down"]),
+        # [9] 형태에서 숫자 추출
+        "comment_count": extract_number(raw["comments"])
+    }
 
 
-async def extract_content(page: Page) -> List[Dict[str, Any]]:
-    """본문 콘텐츠 추출"""
+def build_content(children: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """DESCRIBE_CONTENT_JS가 돌려준 요소 목록으로 본문 콘텐츠 구성"""
     content = []
     order = 0
     
-    container = await page.query_selector(RULIWEB_SELECTORS["content"]["container"])
-    if not container:
-        return content
-    
-    # 모든 자식 요소를 순서대로 처리
-    children = await container.query_selector_all("*")
-    
-    for child in children:
-        tag_name = await child.evaluate("el => el.tagName.toLowerCase()")
+    for info in children:
+        tag_name = info["tag"]
         
         if tag_name == "img":
             # 이미지 처리
-            src = await child.get_attribute("src") or ""
-            alt = await child.get_attribute("alt") or ""
-            width = await child.get_attribute("width") or ""
-            height = await child.get_attribute("height") or ""
-            
-            if src:
+            if info["src"]:
                 content.append({
                     "type": "image",
                     "order": order,
                     "data": {
-                        "src": src,
-                        "alt": alt,
-                        "width": width,
-                        "height": height
+                        "src": info["src"],
+                        "alt": info["alt"],
+                        "width": info["width"],
+                        "height": info["height"]
                     }
                 })
                 order += 1
                 
         elif tag_name == "video":
             # 비디오 처리
-            src = await child.get_attribute("src") or ""
-            autoplay = await child.get_attribute("autoplay") is not None
-            muted = await child.get_attribute("muted") is not None
-            
-            if src:
+            if info["src"]:
                 content.append({
                     "type": "video",
                     "order": order,
                     "data": {
-                        "src": src,
-                        "autoplay": autoplay,
-                        "muted": muted
+                        "src": info["src"],
+                        "autoplay": info["autoplay"],
+                        "muted": info["muted"]
                     }
                 })
                 order += 1
                 
         elif tag_name in ["p", "div"]:
             # 텍스트 처리
-            text = await child.inner_text()
+            text = info["text"]
             if text and text.strip():
                 content.append({
                     "type": "text",
@@ -299,23 +328,10 @@ async def extract_content(page: Page) -> List[Dict[str, Any]]:
     return content
 
 
-async def extract_comments(page: Page) -> List[Dict[str, Any]]:
-    """댓글 추출 (BEST 댓글과 일반 댓글 모두 포함)"""
-    comments = []
-    
-    # BEST 댓글 추출
-    best_items = await page.query_selector_all(RULIWEB_SELECTORS["comments"]["best_items"])
-    for item in best_items:
-        comment_data = await extract_single_comment(item, is_best=True)
-        if comment_data:
-            comments.append(comment_data)
-    
-    # 일반 댓글 추출
-    normal_items = await page.query_selector_all(RULIWEB_SELECTORS["comments"]["normal_items"])
-    for item in normal_items:
-        comment_data = await extract_single_comment(item, is_best=False)
-        if comment_data:
-            comments.append(comment_data)
+def build_comments(raw_comments: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """EXTRACT_COMMENTS_JS가 돌려준 BEST/일반 댓글 원시 데이터로 댓글 목록 구성"""
+    comments = [extract_single_comment(raw, is_best=True) for raw in raw_comments["best"]]
+    comments.extend(extract_single_comment(raw, is_best=False) for raw in raw_comments["normal"])
     
     # 부모-자식 관계 설정
     for i, comment in enumerate(comments):
@@ -329,122 +345,91 @@ async def extract_comments(page: Page) -> List[Dict[str, Any]]:
     return comments
 
 
-async def extract_single_comment(item: ElementHandle, is_best: bool = False) -> Optional[Dict[str, Any]]:
-    """단일 댓글 데이터 추출"""
-    try:
-        comment_data = {}
-        
-        # 댓글 ID
-        comment_id = await item.get_attribute("id") or ""
-        if comment_id.startswith("ct_"):
-            comment_id = comment_id[3:]  # "ct_" 제거
-        comment_data["comment_id"] = comment_id
-        
-        # 작성자
-        author_element = await item.query_selector(RULIWEB_SELECTORS["comments"]["author"])
-        comment_data["author"] = await author_element.inner_text() if author_element else ""
-        
-        # 내용
-        content_element = await item.query_selector(RULIWEB_SELECTORS["comments"]["content"])
-        comment_data["content"] = await content_element.inner_text() if content_element else ""
-        
-        # 날짜
-        date_element = await item.query_selector(RULIWEB_SELECTORS["comments"]["date"])
-        comment_data["date"] = await date_element.inner_text() if date_element else ""
-        
-        # 추천수
-        up_element = await item.query_selector(RULIWEB_SELECTORS["comments"]["up_count"])
-        up_text = await up_element.inner_text() if up_element else "0"
-        comment_data["up_count"] = extract_number(up_text)
-        
-        # 비추천수
-        down_element = await item.query_selector(RULIWEB_SELECTORS["comments"]["down_count"])
-        down_text = await down_element.inner_text() if down_element else "0"
-        comment_data["down_count"] = extract_number(down_text)
-        
-        # 레벨 및 대댓글 여부 판단
-        class_name = await item.get_attribute("class") or ""
-        comment_data["is_reply"] = "child" in class_name
-        comment_data["level"] = 1 if comment_data["is_reply"] else 0
-        
-        # 부모 댓글 ID (나중에 설정)
-        comment_data["parent_comment_id"] = ""
-        
-        # BEST 댓글 여부
-        comment_data["is_best"] = is_best
-        
-        # 미디어 (이미지) 추출 - 루리웹의 특별한 기능
-        media = []
-        image_elements = await item.query_selector_all(RULIWEB_SELECTORS["comments"]["images"])
-        for idx, img in enumerate(image_elements):
-            src = await img.get_attribute("src") or ""
-            alt = await img.get_attribute("alt") or ""
-            width = await img.get_attribute("width") or ""
-            height = await img.get_attribute("height") or ""
-            
-            if src:
-                media.append({
-                    "type": "image",
-                    "order": idx,
-                    "data": {
-                        "src": src,
-                        "alt": alt,
-                        "width": width,
-                        "height": height
-                    }
-                })
-        
-        comment_data["media"] = media
-        return comment_data
-        
-    except Exception as e:
-        print(f"Error extracting comment: {e}")
-        return None
+async def extract_post(page: Page) -> tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """메타데이터, 본문, 댓글을 한 번의 evaluate로 추출 (CDP 왕복 1회)"""
+    raw = await page.evaluate(EXTRACT_POST_JS, RULIWEB_SELECTORS)
+    return build_metadata(raw["metadata"]), build_content(raw["content"]), build_comments(raw["comments"])
+
+
+def extract_single_comment(raw: Dict[str, Any], is_best: bool = False) -> Dict[str, Any]:
+    """EXTRACT_COMMENTS_JS가 돌려준 원시 데이터로 단일 댓글 구성"""
+    # 댓글 ID ("ct_" 제거)
+    comment_id = raw["id"]
+    if comment_id.startswith("ct_"):
+        comment_id = comment_id[3:]
+    
+    # 레벨 및 대댓글 여부 판단
+    is_reply = "child" in raw["className"]
+    
+    # 미디어 (이미지) - 루리웹의 특별한 기능
+    media = [
+        {"type": "image", "order": idx, "data": img}
+        for idx, img in enumerate(raw["images"])
+        if img["src"]
+    ]
+    
+    return {
+        "comment_id": comment_id,
+        "author": raw["author"],
+        "content": raw["content"],
+        "date": raw["date"],
+        "up_count": extract_number(raw["up"]),
+        "down_count": extract_number(raw["down"]),
+        "is_reply": is_reply,
+        "level": 1 if is_reply else 0,
+        "parent_comment_id": "",  # 부모 댓글 ID (나중에 설정)
+        "is_best": is_best,
+        "media": media
+    }
 
 
 def validate_data(data: Dict[str, Any]) -> bool:
     """데이터 유효성 검사"""
     try:
-        validate(instance=data, schema=POST_SCHEMA)
+        _VALIDATE_POST(data)
         return True
-    except ValidationError as e:
+    except fastjsonschema.JsonSchemaException as e:
         print(f"Validation error: {e}")
         return False
 
 
-def save_to_json(data: Dict[str, Any], filename: str) -> bool:
-    """JSON 파일로 저장 (frontend/public 폴더에 저장)"""
-    try:
-        # frontend/public 폴더에 저장
-        public_dir = Path(__file__).parent.parent.parent / "frontend" / "public"
-        public_dir.mkdir(parents=True, exist_ok=True)
-        
-        filepath = public_dir / filename
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        print(f"Data saved to: {filepath}")
-        return True
-    except Exception as e:
-        print(f"Error saving to JSON: {e}")
-        return False
-
-
-async def scrape_ruliweb_post(url: str) -> Optional[Dict[str, Any]]:
-    """루리웹 게시글 스크래핑 메인 함수"""
-    browser = None
+async def scrape_ruliweb_post(
+    url: str,
+    browser: Optional[Browser] = None,
+    page: Optional[Page] = None,
+    include_media: bool = False,
+    get_page: Optional[Callable[[], Awaitable[Page]]] = None
+) -> Optional[Dict[str, Any]]:
+    """루리웹 게시글 스크래핑 메인 함수
+    
+    page를 넘기면 그 페이지를 그대로 쓰고, browser를 넘기면 컨텍스트만 새로 만들어 쓰며,
+    둘 다 없으면 공유 브라우저를 빌려 쓴다 (shared_browser() 밖에서 호출하면 끝날 때 종료).
+    get_page를 넘기면 브라우저가 필요할 때만 불러 그 페이지를 쓴다 (stream_posts 작업자용).
+    include_media가 True이면 이미지/미디어/폰트도 내려받는다 (기본은 차단).
+    """
+    uses_shared_browser = False
+    context = None
     try:
-        # 브라우저 설정
-        browser, page = await setup_browser()
+        # 브라우저 설정 (넘겨받은 페이지/브라우저가 없을 때만 새로 생성)
+        if page is None and get_page is not None:
+            page = await get_page()
+        if page is None:
+            if browser is None:
+                browser = await acquire_shared_browser()
+                uses_shared_browser = True
+            context, page = await new_page(browser, include_media)
         
-        # 페이지 이동
-        await page.goto(url, wait_until='networkidle', timeout=60000)
+        # 페이지 이동 (도메인별 요청 간격 유지, 429/5xx 응답 시 백오프 후 재시도) - 오류 응답이면 추출하지 않음
+        response = await goto_with_backoff(page, url)
+        if response is None or not response.ok:
+            status = response.status if response else "없음"
+            print(f"게시글 응답 오류 (HTTP {status}): {url}")
+            return None
+        await wait_for_post(page, POST_READY_SELECTOR)
         
         # 데이터 추출
         post_id = extract_post_id(url)
-        metadata = await extract_metadata(page)
-        content = await extract_content(page)
-        comments = await extract_comments(page)
+        metadata, content, comments = await extract_post(page)
         
         # 결과 구성
         result = {
@@ -453,7 +438,7 @@ async def scrape_ruliweb_post(url: str) -> Optional[Dict[str, Any]]:
             "metadata": metadata,
             "content": content,
             "comments": comments,
-            "scraped_at": datetime.now(pytz.timezone('Asia/Seoul')).isoformat()
+            "scraped_at": datetime.now(KST).isoformat()
         }
         
         # 유효성 검사
@@ -467,8 +452,42 @@ async def scrape_ruliweb_post(url: str) -> Optional[Dict[str, Any]]:
         print(f"Error scraping post: {e}")
         return None
     finally:
-        if browser:
-            await browser.close()
+        if context:
+            await context.close()
+        # 빌려 쓴 공유 브라우저 반납
+        if uses_shared_browser:
+            await release_shared_browser()
+
+
+def stream_ruliweb_posts(
+    urls: List[str],
+    concurrency: int = 4,
+    include_media: bool = False,
+    seen_path: Optional[Path] = None
+) -> AsyncIterator[tuple[int, Optional[Dict[str, Any]]]]:
+    """여러 게시글을 동시에 스크래핑하면서 끝나는 순서대로 (urls 인덱스, 결과)를 내보냄
+    
+    작업자/브라우저 관리는 common.stream_posts가 맡는다.
+    seen_path를 넘기면 그 파일에 기록된 URL은 건너뛰고(내보내지 않음), 성공한 URL은 바로 기록한다.
+    중간에 그만 받으려면 contextlib.aclosing으로 감싸 작업자와 브라우저를 바로 정리한다.
+    """
+    return stream_posts(urls, scrape_ruliweb_post, concurrency, include_media, seen_path=seen_path)
+
+
+async def scrape_ruliweb_posts(
+    urls: List[str],
+    concurrency: int = 4,
+    include_media: bool = False,
+    seen_path: Optional[Path] = None
+) -> List[Optional[Dict[str, Any]]]:
+    """여러 게시글을 동시에 스크래핑 (결과는 urls 순서 유지, 건너뛴 URL은 None)
+    
+    결과를 차례로 처리하려면 stream_ruliweb_posts를 쓴다.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(urls)
+    async for index, result in stream_ruliweb_posts(urls, concurrency, include_media, seen_path):
+        results[index] = result
+    return results
 
 
 async def main():
@@ -6,22 +6,108 @@
 import pytest
 import asyncio
 import sys
+from datetime import datetime
 from pathlib import Path
 
+import httpx
+
 # 상위 디렉토리의 scrapers 모듈을 import하기 위해 경로 추가
 sys.path.append(str(Path(__file__).parent.parent))
 
+from scrapers.common import (
+    extract_number,
+    backoff_delay,
+    wait_for_request_slot,
+    goto_with_backoff,
+    BACKOFF_CAP,
+    MAX_RETRIES,
+    REQUESTS_PER_SECOND,
+    launch_browser,
+    acquire_shared_browser,
+    release_shared_browser,
+    stream_posts,
+    load_seen_urls,
+    open_seen_urls_log,
+    append_seen_url,
+    KST
+)
 from scrapers.fmkorea_scraper import (
     extract_post_id as fmkorea_extract_post_id,
-    extract_number,
+    fetch_static_html,
+    parse_post_html,
+    extract_post,
+    iter_comments,
+    validate_data,
     scrape_fmkorea_post
 )
 from scrapers.ruliweb_scraper import (
     extract_post_id as ruliweb_extract_post_id,
+    extract_single_comment as ruliweb_extract_single_comment,
+    build_metadata as ruliweb_build_metadata,
     scrape_ruliweb_post
 )
 
 
+# 에펨코리아 게시글 HTML 샘플 (정적 파싱 테스트용)
+FMKOREA_SAMPLE_HTML = '''
+<div class="rd rd_nav_style2 clear" data-docsrl="8485393463">
+    <div class="rd_hd clear">
+        <div class="board clear">
+            <div class="top_area ngeb">
+                <span class="date m_no">2025.06.06 15:27</span>
+                <h1 class="np_18px"><span class="np_18px_span">결국 800만달러 송금했다 아님??</span></h1>
+            </div>
+            <div class="btm_area clear">
+                <div class="side">
+                    <a href="#popup_menu_area" class="member_4348938623 member_plate"><img src="//image.fmkorea.com/level.png" alt="[레벨:26]" class="level">밸리언트</a>
+                </div>
+                <div class="side fr">
+                    <span>조회 수 <b>156</b></span>
+                    <span>추천 수 <b>4</b></span>
+                    <span>비추천 수 <b>1</b></span>
+                    <span>댓글 <b>5</b></span>
+                </div>
+            </div>
+        </div>
+    </div>
+    <div class="rd_body clear">
+        <article>
+            <div class="document_8485393463_4348938623 xe_content">
+                <p><a class="highslide" href="//image.fmkorea.com/files/a.png"><img src="//image.fmkorea.com/files/a.png" alt="image.png" width="1151" height="692"></a></p>
+                <p>왜 주변이나 저짝갤 얘기해보면 사법부랑 검찰을 계속 탓하는거냐</p>
+            </div>
+        </article>
+    </div>
+</div>
+<div class="fdb_lst_wrp">
+    <ul class="fdb_lst_ul">
+        <li id="comment_8485411698" class="fdb_itm clear">
+            <div class="meta">
+                <a href="#popup_menu_area" class="member_4168660689 member_plate">으아악1</a>
+                <span class="date">2 분 전</span>
+            </div>
+            <div class="comment-content">
+                <div class="comment_8485411698_4168660689 xe_content">그래서 뭐 어쩌라고</div>
+            </div>
+            <span class="voted_count">3</span>
+            <span class="blamed_count"></span>
+        </li>
+        <li id="comment_8485413822" class="fdb_itm clear re bg1" style="margin-left:2%">
+            <div class="meta">
+                <a href="#popup_menu_area" class="member_4348938623 member_plate">밸리언트</a>
+                <span class="date">2 분 전</span>
+            </div>
+            <div class="comment-content document_writer">
+                <div class="comment_8485413822_4348938623 xe_content">
+                    <a class="findParent" href="javascript:;">으아악1</a> 논리가 이해가 안됨
+                </div>
+            </div>
+        </li>
+    </ul>
+</div>
+'''
+
+
 class TestFMKoreaScraper:
     """에펨코리아 스크래퍼 테스트"""
     
@@ -35,6 +121,13 @@ class TestFMKoreaScraper:
         url_with_slash = "https://www.fmkorea.com/8485393463/"
         post_id_with_slash = fmkorea_extract_post_id(url_with_slash)
         assert post_id_with_slash == "8485393463"
+        
+        # 숫자로 끝나지 않는 URL
+        assert fmkorea_extract_post_id("https://www.fmkorea.com/index.php?mid=politics") == ""
+        
+        # document_srl 쿼리 형태
+        url_with_query = "https://www.fmkorea.com/index.php?mid=politics&document_srl=8485393463&page=2"
+        assert fmkorea_extract_post_id(url_with_query) == "8485393463"
     
     def test_extract_number(self):
         """숫자 추출 테스트"""
@@ -44,6 +137,262 @@ class TestFMKoreaScraper:
         assert extract_number("추천 41") == 41
         assert extract_number("") == 0
         assert extract_number("텍스트만") == 0
+        assert extract_number(" 7 ") == 7
+        assert extract_number("-3") == 3
+    
+    def test_backoff_delay(self):
+        """백오프 대기 시간 테스트 (지수 증가, 상한 + 지터)"""
+        assert 2.0 <= backoff_delay(1) <= 2.3
+        assert 4.0 <= backoff_delay(2) <= 4.3
+        assert BACKOFF_CAP <= backoff_delay(20) <= BACKOFF_CAP + 0.3
+    
+    @pytest.mark.asyncio
+    async def test_wait_for_request_slot(self):
+        """같은 도메인 요청은 REQUESTS_PER_SECOND 간격으로 대기"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await wait_for_request_slot("https://slot-test.example/1")
+        await wait_for_request_slot("https://slot-test.example/2")
+        assert loop.time() - start >= 1.0 / REQUESTS_PER_SECOND - 0.01
+
+    @pytest.mark.asyncio
+    async def test_goto_with_backoff_gives_up(self, monkeypatch):
+        """재시도 후에도 429/5xx이면 오류 페이지 대신 None 반환"""
+        class ErrorResponse:
+            status = 503
+            ok = False
+
+        class ErrorPage:
+            calls = 0
+
+            async def goto(self, url, **kwargs):
+                self.calls += 1
+                return ErrorResponse()
+
+        monkeypatch.setattr("scrapers.common.backoff_delay", lambda failures: 0.0)
+        page = ErrorPage()
+        assert await goto_with_backoff(page, "https://goto-test.example/1") is None
+        assert page.calls == MAX_RETRIES + 1
+
+    @pytest.mark.asyncio
+    async def test_fetch_static_html_backs_off(self, monkeypatch):
+        """정적 요청도 429/5xx이면 백오프 후 재시도"""
+        statuses = iter([503, 200])
+
+        def handler(request):
+            return httpx.Response(next(statuses), text="<div class='rd_body'></div>")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr("scrapers.fmkorea_scraper.get_http_client", lambda: client)
+        monkeypatch.setattr("scrapers.common.backoff_delay", lambda failures: 0.0)
+        response = await fetch_static_html("https://static-test.example/1")
+        await client.aclose()
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_static_failure_routes_to_browser(self, monkeypatch):
+        """없는 게시글이나 재시도 초과는 포기하고, 차단 응답이나 요청 실패는 브라우저로 대체"""
+        def handler(request):
+            status = int(request.url.host.split(".")[0][len("status-"):])
+            if status == 0:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(status, text="blocked")
+
+        browser_calls = []
+
+        async def fake_get_page():
+            browser_calls.append(True)
+            raise RuntimeError("browser not available in test")
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monkeypatch.setattr("scrapers.fmkorea_scraper.get_http_client", lambda: client)
+        monkeypatch.setattr("scrapers.common.backoff_delay", lambda failures: 0.0)
+        expected = {404: False, 410: False, 503: False, 403: True, 430: True, 0: True}
+        for status, uses_browser in expected.items():
+            browser_calls.clear()
+            url = f"https://status-{status}.example/1"
+            assert await scrape_fmkorea_post(url, get_page=fake_get_page) is None
+            assert bool(browser_calls) is uses_browser, status
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_shared_browser_lease(self, monkeypatch):
+        """동시에 빌려도 브라우저는 한 번만 실행하고, 마지막 반납 때 한 번만 종료"""
+        events = []
+
+        class FakeBrowser:
+            def is_connected(self):
+                return True
+
+            async def close(self):
+                events.append("close")
+
+        class FakePlaywright:
+            async def stop(self):
+                events.append("stop")
+
+        async def fake_launch():
+            events.append("launch")
+            await asyncio.sleep(0.01)
+            return FakePlaywright(), FakeBrowser()
+
+        monkeypatch.setattr("scrapers.common.launch_browser", fake_launch)
+        browsers = await asyncio.gather(*(acquire_shared_browser() for _ in range(3)))
+        assert len(set(map(id, browsers))) == 1
+        await asyncio.gather(*(release_shared_browser() for _ in range(3)))
+        assert events == ["launch", "close", "stop"]
+
+    def test_shared_browser_lease_across_loops(self, monkeypatch):
+        """asyncio.run을 여러 번 호출해도 공유 브라우저 락을 동시에 기다릴 수 있음"""
+        launches = []
+
+        class FakeBrowser:
+            def is_connected(self):
+                return True
+
+            async def close(self):
+                pass
+
+        class FakePlaywright:
+            async def stop(self):
+                pass
+
+        async def fake_launch():
+            launches.append(asyncio.get_running_loop())
+            await asyncio.sleep(0.01)
+            return FakePlaywright(), FakeBrowser()
+
+        async def lease():
+            await asyncio.gather(*(acquire_shared_browser() for _ in range(3)))
+            await asyncio.gather(*(release_shared_browser() for _ in range(3)))
+
+        monkeypatch.setattr("scrapers.common.launch_browser", fake_launch)
+        asyncio.run(lease())
+        asyncio.run(lease())
+        assert len(launches) == 2
+        assert launches[0] is not launches[1]
+
+    @pytest.mark.asyncio
+    async def test_stream_posts_without_browser(self, monkeypatch):
+        """브라우저가 필요 없는 게시글만 있으면 Chromium을 실행하지 않음"""
+        async def fail_launch():
+            raise AssertionError("브라우저를 실행하면 안 됨")
+
+        async def scrape_static(url, get_page=None):
+            return {"url": url}
+
+        monkeypatch.setattr("scrapers.common.launch_browser", fail_launch)
+        urls = ["https://stream-test.example/1", "https://stream-test.example/2"]
+        results = dict([item async for item in stream_posts(urls, scrape_static, concurrency=2)])
+        assert results == {0: {"url": urls[0]}, 1: {"url": urls[1]}}
+    
+    def test_parse_post_html(self):
+        """정적 HTML 파싱 테스트 (브라우저 없이)"""
+        metadata, content, comments = parse_post_html(FMKOREA_SAMPLE_HTML)
+        
+        assert metadata["title"] == "결국 800만달러 송금했다 아님??"
+        assert metadata["author"] == "밸리언트"
+        assert metadata["date"] == "2025.06.06 15:27"
+        assert metadata["view_count"] == 156
+        assert metadata["up_count"] == 4
+        assert metadata["down_count"] == 1
+        assert metadata["comment_count"] == 5
+        
+        assert any(item["type"] == "image" for item in content)
+        # 중첩된 p/div 텍스트가 중복으로 들어가지 않아야 함
+        texts = [item["data"]["text"] for item in content if item["type"] == "text"]
+        assert texts == ["왜 주변이나 저짝갤 얘기해보면 사법부랑 검찰을 계속 탓하는거냐"]
+        assert [item["order"] for item in content] == list(range(len(content)))
+        
+        assert len(comments) == 2
+        assert comments[0]["comment_id"] == "8485411698"
+        assert comments[0]["author"] == "으아악1"
+        assert comments[0]["up_count"] == 3
+        assert comments[0]["level"] == 0
+        assert comments[1]["is_reply"] is True
+        assert comments[1]["level"] == 1
+        assert comments[1]["parent_comment_id"] == "8485411698"
+
+    def test_parse_content_keeps_inline_text(self):
+        """안쪽 블록 옆의 인라인 텍스트가 빠지지 않는지 테스트"""
+        html = (
+            '<div class="xe_content"><div>Hello <b>world</b> and <a href="#">link</a>'
+            '<p>para</p></div></div>'
+        )
+        _, content, _ = parse_post_html(html)
+        texts = [item["data"]["text"] for item in content if item["type"] == "text"]
+        assert texts == ["Hello world and link", "para"]
+
+    def test_parse_post_html_matches_inner_text(self):
+        """정적 텍스트가 innerText처럼 <br>은 줄바꿈으로, script/style은 제외하는지 테스트"""
+        html = (
+            '<div class="xe_content"><p>첫 줄<br>둘째 줄<script>var x = 1;</script></p></div>'
+            '<ul class="fdb_lst_ul"><li id="comment_1" class="fdb_itm">'
+            '<div class="comment-content"><div class="xe_content">'
+            '댓글<br>  내용<style>.a { color: red; }</style></div></div></li></ul>'
+        )
+        _, content, comments = parse_post_html(html)
+        assert content[0]["data"]["text"] == "첫 줄\n둘째 줄"
+        assert comments[0]["content"] == "댓글\n내용"
+
+    @pytest.mark.asyncio
+    async def test_parse_post_html_matches_browser(self):
+        """정적 파싱 결과가 브라우저 추출 결과와 같은지 테스트 (브라우저를 띄울 수 없으면 건너뜀)"""
+        html = FMKOREA_SAMPLE_HTML.replace(
+            "그래서 뭐 어쩌라고", "그래서<br>뭐 어쩌라고<script>var x = 1;</script>"
+        )
+        try:
+            playwright, browser = await launch_browser()
+        except Exception as e:
+            pytest.skip(f"브라우저 실행 불가: {e}")
+        try:
+            page = await browser.new_page()
+            await page.set_content(html)
+            assert await extract_post(page) == parse_post_html(html)
+            assert [comment async for comment in iter_comments(page)] == parse_post_html(html)[2]
+        finally:
+            await browser.close()
+            await playwright.stop()
+
+    def test_validate_data(self):
+        """컴파일된 스키마 검증 테스트"""
+        metadata, content, comments = parse_post_html(FMKOREA_SAMPLE_HTML)
+        result = {
+            "post_id": "8485393463",
+            "community": "fmkorea",
+            "metadata": metadata,
+            "content": content,
+            "comments": comments,
+            "scraped_at": datetime.now(KST).isoformat()
+        }
+        assert validate_data(result) is True
+        
+        del result["metadata"]["title"]
+        assert validate_data(result) is False
+    
+    def test_parse_lazy_image(self):
+        """지연 로딩 이미지는 data-original 주소를 사용"""
+        html = FMKOREA_SAMPLE_HTML.replace(
+            '<img src="//image.fmkorea.com/files/a.png"',
+            '<img src="//image.fmkorea.com/blank.gif" data-original="//image.fmkorea.com/files/a.png"'
+        )
+        _, content, _ = parse_post_html(html)
+        
+        images = [item for item in content if item["type"] == "image"]
+        assert images[0]["data"]["src"] == "//image.fmkorea.com/files/a.png"
+    
+    def test_seen_urls_roundtrip(self, tmp_path):
+        """스크래핑한 URL 기록 저장/로드 테스트"""
+        seen_path = tmp_path / "scraped_urls.jsonl"
+        assert load_seen_urls(seen_path) == set()
+        
+        urls = ["https://www.fmkorea.com/8485393463", "https://www.fmkorea.com/8485697756"]
+        with open_seen_urls_log(seen_path) as log:
+            for url in urls:
+                append_seen_url(log, url)
+            # 기록 중에 중단돼 잘린 줄은 무시
+            log.write(b'"https://www.fmkorea.com/84')
+        assert load_seen_urls(seen_path) == set(urls)
     
     @pytest.mark.asyncio
     async def test_scrape_post_structure(self):
@@ -90,6 +439,52 @@ class TestRuliwebScraper:
         post_id = ruliweb_extract_post_id(url)
         assert post_id == "38077550"
     
+    def test_extract_single_comment(self):
+        """댓글 원시 데이터 → 댓글 구성 테스트"""
+        raw = {
+            "id": "ct_12345",
+            "className": "comment_element child",
+            "author": "작성자",
+            "content": "내용",
+            "date": "25.06.06 15:27",
+            "up": "3",
+            "down": "",
+            "images": [
+                {"src": "", "alt": "", "width": "", "height": ""},
+                {"src": "https://i1.ruliweb.com/a.png", "alt": "a", "width": "100", "height": "50"}
+            ]
+        }
+        comment = ruliweb_extract_single_comment(raw, is_best=True)
+        
+        assert comment["comment_id"] == "12345"
+        assert comment["up_count"] == 3
+        assert comment["down_count"] == 0
+        assert comment["is_reply"] is True
+        assert comment["level"] == 1
+        assert comment["is_best"] is True
+        assert len(comment["media"]) == 1
+        assert comment["media"][0]["order"] == 1
+        assert comment["media"][0]["data"]["src"] == "https://i1.ruliweb.com/a.png"
+    
+    def test_build_metadata(self):
+        """메타데이터 원시 데이터 → 메타데이터 구성 테스트"""
+        raw = {
+            "title": "제목",
+            "category": "정치",
+            "author": "작성자",
+            "date": "2025.06.06 (15:27:01)",
+            "viewText": "추천 41 | 조회 1506",
+            "up": "41",
+            "down": "0",
+            "comments": "[9]"
+        }
+        metadata = ruliweb_build_metadata(raw)
+        
+        assert metadata["view_count"] == 1506
+        assert metadata["up_count"] == 41
+        assert metadata["down_count"] == 0
+        assert metadata["comment_count"] == 9
+    
     @pytest.mark.asyncio
     async def test_scrape_post_structure(self):
         """게시글 스크래핑 구조 테스트"""